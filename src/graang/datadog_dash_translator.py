@@ -1,23 +1,78 @@
 #!/usr/bin/env python3
 
-import argparse
-import json
 import sys
-from collections import defaultdict
-import textwrap
-from operator import itemgetter
-from typing import Dict, List, Any, Optional, Union, Tuple
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 from graang.datadog_dashboard import DatadogDashboard
-from graang.errors import DashboardParsingError
-from graang.utils import convert_requests_to_targets, build_grafana_target, GridLayoutCalculator
+from graang.errors import GraangError
+from graang.utils import build_grafana_dashboard, convert_requests_to_targets, convert_template_variables, dump_json, dumps_json, GridLayoutCalculator, WRITE_BUFFER_SIZE
 from graang.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+
+def _expand_dashboard_paths(paths: List[str]) -> List[str]:
+    """Replace each directory in paths with the JSON files it contains, in name order"""
+    expanded: List[str] = []
+    for path in paths:
+        if Path(path).is_dir():
+            expanded.extend(sorted(str(p) for p in Path(path).glob('*.json')))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def _analyze_dashboard(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Parse a dashboard and render its report; runs in a worker process
+
+    Returns:
+        tuple: (report, error message or None)
+    """
+    try:
+        return DatadogDashboard(path).render_report(), None
+    except GraangError as e:
+        return "", str(e)
+
+
+def analyze_dashboards(paths: List[str]) -> bool:
+    """
+    Print the analysis report of several dashboards, parsing them in parallel
+
+    Reports are printed in the order of paths. Returns False if any dashboard failed to parse.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    ok = True
+    with ProcessPoolExecutor() as executor:
+        for path, (report, error) in zip(paths, executor.map(_analyze_dashboard, paths)):
+            if error is not None:
+                sys.stderr.write(f"Error: {path}: {error}\n")
+                ok = False
+            else:
+                sys.stdout.write(report)
+    return ok
+
+
+def _write_stdout_bytes(data: bytes) -> None:
+    """Write UTF-8 encoded data to stdout whatever encoding the text layer uses"""
+    stream = getattr(sys.stdout, 'buffer', None)
+    if stream is None:
+        # A text-only stream (e.g. io.StringIO) takes any str
+        sys.stdout.write(data.decode('utf-8'))
+        return
+    # Flush pending text first so output stays in order
+    sys.stdout.flush()
+    stream.write(data)
+    stream.flush()
+
+
 def main() -> None:
+    import argparse
+
     # Parse the arguments
     parser = argparse.ArgumentParser(description='Analyze Datadog dashboard and optionally convert to Grafana format')
-    parser.add_argument('dashboard', help='the datadog dashboard JSON file to analyze')
+    parser.add_argument('dashboard', nargs='+', help='the datadog dashboard JSON file(s) or directories to analyze')
     parser.add_argument('-o', '--output', help='output file for the Grafana dashboard', default=None)
     parser.add_argument('--grafana-folder', help='Grafana folder name to save the report and converted dashboard', default='Converted')
     parser.add_argument('--datasource', help='Grafana datasource name', default='prometheus')
@@ -28,9 +83,20 @@ def main() -> None:
     parser.add_argument('-c','--convert', action='store_true', help='Convert the dashboard to Grafana format and generate a report')
     args = parser.parse_args()
 
+    paths = _expand_dashboard_paths(args.dashboard)
+    if not paths:
+        parser.error("no dashboard JSON files found")
+    if len(paths) > 1:
+        if args.convert:
+            parser.error("--convert takes a single dashboard file")
+        if args.output:
+            parser.error("--output takes a single dashboard file")
+        sys.exit(0 if analyze_dashboards(paths) else 1)
+
     try:
-        dd_dashboard = DatadogDashboard(args.dashboard)
-    except DashboardParsingError as e:
+        # Conversion only needs the widget lists, so skip the query analysis behind the report
+        dd_dashboard = DatadogDashboard(paths[0], analyze=not args.convert)
+    except GraangError as e:
         sys.stderr.write(f"Error: {str(e)}\n")
         sys.exit(1)
 
@@ -38,17 +104,35 @@ def main() -> None:
         grafana_dashboard = convert_to_grafana(dd_dashboard, args)
         if args.output:
             try:
-                with open(args.output, 'w') as f:
-                    json.dump(grafana_dashboard, f, indent=4)
-                logger.info(f"Grafana dashboard converted and saved to {args.output}")
+                with open(args.output, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                    dump_json(grafana_dashboard, f)
+                logger.info("Grafana dashboard converted and saved to %s", args.output)
             except Exception as e:
                 sys.stderr.write(f"Error saving output file: {str(e)}\n")
                 sys.exit(1)
         else:
-            print(json.dumps(grafana_dashboard, indent=4))
+            _write_stdout_bytes(dumps_json(grafana_dashboard) + b'\n')
     else:
         dd_dashboard.print_report()
 
+
+# Mapping of Datadog widget types to Grafana panel types
+# This dictionary maps Datadog widget types (keys) to their corresponding Grafana panel types (values).
+# For example:
+# - "timeseries" in Datadog maps to "timeseries" in Grafana.
+# - "toplist" in Datadog maps to "table" in Grafana.
+# - "group" widgets in Datadog are mapped to "row" in Grafana, representing a logical grouping of panels.
+_WIDGET_TYPE_TO_PANEL_TYPE: Dict[str, str] = {
+    "timeseries": "timeseries",
+    "toplist": "table",
+    "heatmap": "heatmap",
+    "distribution": "barchart",
+    "query_value": "stat",
+    "alert_graph": "graph",
+    "group": "row"  # Example: group widgets could map to rows
+}
+
+
 def convert_to_grafana(dd_dashboard: Any, args: Any) -> Dict[str, Any]:  # Using Any for args since it's an argparse.Namespace
     """
     Convert Datadog dashboard to Grafana format
@@ -63,117 +147,49 @@ def convert_to_grafana(dd_dashboard: Any, args: Any) -> Dict[str, Any]:  # Using
     Raises:
         ValueError: If there's an error with grid position format
     """
-    grafana_dashboard: Dict[str, Any] = {
-        "id": None,
-        "uid": args.uid,
-        "title": dd_dashboard.title,
-        "tags": [],
-        "timezone": "browser",
-        "schemaVersion": 36,
-        "version": 1,
-        "refresh": "5s",
-        "time": {
-            "from": args.time_from,
-            "to": args.time_to
-        },
-        "panels": [],
-        "templating": {
-            "list": []
-        },
-        "annotations": {
-            "list": [{
-                "builtIn": 1,
-                "datasource": {
-                    "type": "grafana",
-                    "uid": "-- Grafana --"
-                },
-                "enable": True,
-                "hide": True,
-                "iconColor": "rgba(0, 211, 255, 1)",
-                "name": "Annotations & Alerts",
-                "type": "dashboard"
-            }]
-        }
-    }
-    # Initialize grid layout calculator
-    grid_layout = GridLayoutCalculator()
-
-    # Mapping of Datadog widget types to Grafana panel types
-    # This dictionary maps Datadog widget types (keys) to their corresponding Grafana panel types (values).
-    # For example:
-    # - "timeseries" in Datadog maps to "timeseries" in Grafana.
-    # - "toplist" in Datadog maps to "table" in Grafana.
-    # - "group" widgets in Datadog are mapped to "row" in Grafana, representing a logical grouping of panels.
-    widget_type_to_panel_type: Dict[str, str] = {
-        "timeseries": "timeseries",
-        "toplist": "table",
-        "heatmap": "heatmap",
-        "distribution": "barchart",
-        "query_value": "stat",
-        "alert_graph": "graph",
-        "group": "row"  # Example: group widgets could map to rows
-    }
-
+    grafana_dashboard: Dict[str, Any] = build_grafana_dashboard(
+        dd_dashboard.title, args.uid, time_from=args.time_from, time_to=args.time_to
+    )
     # Convert template variables
-    for var in dd_dashboard.template_variables:
-        grafana_var = {
-            "name": var.get("name", ""),
-            "type": "custom",
-            "datasource": {
-                "type": "prometheus",
-                "uid": "prometheus"
-            },
-            "current": {},
-            "options": [],
-            "query": "",
-            "skipUrlSync": False,
-            "hide": 0
-        }
-
-        # Handle different variable types
-        if "prefix" in var:
-            grafana_var["query"] = var.get("prefix", "")
-
-        # Add values if available
-        if "default" in var:
-            grafana_var["current"] = {"value": var["default"], "text": var["default"]}
-
-        if "values" in var:
-            for value in var["values"]:
-                grafana_var["options"].append({"text": value, "value": value})
-
-        grafana_dashboard["templating"]["list"].append(grafana_var)
+    grafana_dashboard["templating"]["list"].extend(convert_template_variables(dd_dashboard.template_variables))
 
     # Convert widgets to panels
     if not dd_dashboard.widgets:
         logger.warning("No widgets found in the Datadog dashboard. Creating an empty Grafana dashboard.")
     else:
+        grid_layout = GridLayoutCalculator()
         panel_id: int = 1
+        get_panel_type = _WIDGET_TYPE_TO_PANEL_TYPE.get
+        add_panel = grafana_dashboard['panels'].append
         for widget in dd_dashboard.widgets:
-            if 'definition' in widget:
-                definition = widget['definition']
-                widget_type = widget['definition'].get('type', 'unknown')
-                if widget_type not in widget_type_to_panel_type:
-                    logger.warning(f"Unknown widget type '{widget_type}' encountered. Defaulting to 'graph'.")
-
-                # Calculate grid position dynamically
-                grid_pos = grid_layout.get_next_grid_position(widget, panel_id)
-
-                panel = {
-                    "id": panel_id,
-                    "type": widget_type_to_panel_type.get(widget_type, 'graph'),  # Map widget type to panel type
-                    "title": definition.get('title', 'No Title'),
-                    "gridPos": grid_pos,
-                    "targets": []
-                }
-                panel_id += 1
-
-                # Extract and convert queries
-                if 'requests' in definition:
-                    grafana_targets = convert_requests_to_targets(definition['requests'], args.datasource)
-                    panel['targets'].extend(grafana_targets)
-
-                grafana_dashboard['panels'].append(panel)
+            definition = widget.get('definition') if isinstance(widget, dict) else None
+            if definition is None:
+                continue
+
+            widget_type = definition.get('type', 'unknown')
+            panel_type = get_panel_type(widget_type)
+            if panel_type is None:
+                logger.warning(f"Unknown widget type '{widget_type}' encountered. Defaulting to 'graph'.")
+                panel_type = 'graph'
+
+            # Calculate grid position dynamically
+            grid_pos = grid_layout.get_next_grid_position(widget, panel_id)
+
+            panel = {
+                "id": panel_id,
+                "type": panel_type,  # Map widget type to panel type
+                "title": definition.get('title', 'No Title'),
+                "gridPos": grid_pos,
+                "targets": []
+            }
+            panel_id += 1
+
+            # Extract and convert queries
+            requests = definition.get('requests')
+            if requests:
+                panel['targets'].extend(convert_requests_to_targets(requests, args.datasource))
+
+            add_panel(panel)
 
     return grafana_dashboard
 
@@ -1,9 +1,9 @@
-import json
+import io
+import re
 import sys
-from collections import defaultdict
-import textwrap
-from operator import itemgetter
-from typing import Dict, List, Any, Optional, Union
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, TextIO, Union
 
 from graang.errors import DashboardParsingError, FileOperationError
 from graang.validation import validate_dashboard_file, InputSanitizer
@@ -11,23 +11,165 @@ from graang.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Captures the metric source ("system" in "avg:system.cpu.user{*}"): the text
+# between the first ':' and the first '.', provided no '{' or ':' comes first
+_METRIC_SOURCE_RE = re.compile(r'[^:]*:([^.{:]*)\.')
+
+
+@lru_cache(maxsize=4096)
+def _query_source(query: str) -> Optional[str]:
+    """Return the metric source of a query, or None if it has none"""
+    match = _METRIC_SOURCE_RE.match(query)
+    return match.group(1) if match else None
+
+
+def _intern(value: Any) -> Any:
+    """Intern string values so repeated widget and visualization types share one object"""
+    return sys.intern(value) if type(value) is str else value
+
+
+# Report separators and header
+_SEP = '-' * 80
+_SEP2 = '=' * 80
+_HDR = f"{'DASHBOARD ANALYSIS REPORT':^80}"
+
+# Precomputed indentation strings for the structure section of the report
+_INDENTS = tuple(' ' * i for i in range(256))
+
+
+def _indent(width: int) -> str:
+    """Return ``width`` spaces, taken from the precomputed table when possible"""
+    return _INDENTS[width] if width < len(_INDENTS) else ' ' * width
+
+
+def _flatten_requests(requests: Any) -> List[Dict[str, Any]]:
+    """
+    Normalize a widget's requests into a flat list of request dicts
+
+    Datadog uses three shapes: a list of requests, a dict of requests, and a
+    dict of request lists (e.g. ``{"fill": {...}, "size": [...]}``).
+    """
+    if isinstance(requests, list):
+        return [request for request in requests if isinstance(request, dict)]
+    if isinstance(requests, dict):
+        return [
+            request
+            for value in requests.values()
+            for request in (value if isinstance(value, list) else (value,))
+            if isinstance(request, dict)
+        ]
+    return []
+
+
+def _format_request(request: Dict[str, Any], indent: int, index: Union[int, str]) -> str:
+    """Format the query, subquery and formula lines of a single request"""
+    lines: List[str] = []
+    write = lines.append
+    pad, pad2 = _indent(indent), _indent(indent + 2)
+    q = request.get('q')
+    if q is not None:
+        write(f"{pad}Query {index}: {q}\n")
+        if 'aggregator' in request:
+            write(f"{pad2}Aggregator: {request['aggregator']}\n")
+        if 'type' in request:
+            write(f"{pad2}Type: {request['type']}\n")
+
+    # Handle newer format with queries array
+    queries = request.get('queries')
+    if isinstance(queries, list):
+        for i, query_obj in enumerate(queries):
+            if 'query' in query_obj:
+                write(f"{pad}Subquery {i+1}: {query_obj['query']}\n")
+                if 'data_source' in query_obj:
+                    write(f"{pad2}Data Source: {query_obj['data_source']}\n")
+                if 'name' in query_obj:
+                    write(f"{pad2}Name: {query_obj['name']}\n")
+                if 'aggregator' in query_obj:
+                    write(f"{pad2}Aggregator: {query_obj['aggregator']}\n")
+
+    # Handle formulas
+    formulas = request.get('formulas')
+    if isinstance(formulas, list):
+        for i, formula in enumerate(formulas):
+            if 'formula' in formula:
+                alias = formula.get('alias', '')
+                formula_text = formula['formula']
+                write(f"{pad}Formula {i+1}: {formula_text} (alias: {alias})\n")
+
+    return ''.join(lines)
+
+
+def _format_requests(requests: Any, indent: int) -> str:
+    """Format the queries listed under a widget at the given indent in the structure report"""
+    pad2 = _indent(indent + 2)
+    if isinstance(requests, list):
+        parts = [f"{pad2}Queries ({len(requests)}):\n"]
+        parts.extend(
+            _format_request(request, indent + 4, j) for j, request in enumerate(requests) if isinstance(request, dict)
+        )
+    elif isinstance(requests, dict):
+        parts = [f"{pad2}Queries (dictionary format):\n"]
+        for key, request in requests.items():
+            if isinstance(request, dict):
+                parts.append(_format_request(request, indent + 4, key))
+            elif isinstance(request, list):
+                parts.append(f"{_indent(indent + 4)}{key} ({len(request)} queries)\n")
+                parts.extend(
+                    _format_request(r, indent + 6, j) for j, r in enumerate(request) if isinstance(r, dict)
+                )
+    else:
+        return ''
+    return ''.join(parts)
+
+
+def _format_widget_hierarchy(widgets: List[Dict[str, Any]], indent: int) -> str:
+    """Format the structure section of the report for a widget list, starting at indent"""
+    parts: List[str] = []
+    for i, widget in enumerate(widgets):
+        definition = widget.get('definition') if isinstance(widget, dict) else None
+        if definition is None:
+            continue
+        widget_type = definition.get('type', 'unknown')
+        parts.append(f"{_indent(indent)}Widget {i+1}: {definition.get('title', '[No title]')} ({widget_type})\n")
+
+        # For group widgets, list their children first
+        if widget_type == 'group' and 'widgets' in definition:
+            children = definition['widgets']
+            parts.append(f"{_indent(indent + 2)}Group contains {len(children)} widgets:\n")
+            parts.append(_format_widget_hierarchy(children, indent + 4))
+
+        parts.append(_format_requests(definition.get('requests'), indent))
+    return ''.join(parts)
+
 
 class DatadogDashboard:
-    def __init__(self, dashboard_path: str) -> None:
+    __slots__ = (
+        'dashboard_path', 'analyze', 'title', 'description', 'widgets', 'group_widgets',
+        'nested_widgets', 'data', 'is_valid', 'total_queries', 'query_types', 'metric_sources',
+        'widget_types', 'visualization_types', 'template_variables', '_queries', '_query_type_names'
+    )
+
+    def __init__(self, dashboard_path: str, analyze: bool = True) -> None:
         self.dashboard_path: str = dashboard_path
+        # When False only the metadata and widget lists are extracted (enough for conversion)
+        self.analyze: bool = analyze
         self.title: str = "Untitled Dashboard"
         self.description: str = ""
         self.widgets: List[Dict[str, Any]] = []
         self.group_widgets: List[Dict[str, Any]] = []
         self.nested_widgets: List[Dict[str, Any]] = []
-        self.data: Dict[str, Any] = {}
+        # Raw dashboard JSON, released once parse_dashboard has extracted what it needs
+        self.data: Optional[Dict[str, Any]] = {}
         self.is_valid: bool = False
         self.total_queries: int = 0
-        self.query_types: Dict[str, int] = defaultdict(int)
-        self.metric_sources: Dict[str, int] = defaultdict(int)
-        self.widget_types: Dict[str, int] = defaultdict(int)
-        self.visualization_types: Dict[str, int] = defaultdict(int)
+        self.query_types: Counter[str] = Counter()
+        self.metric_sources: Counter[str] = Counter()
+        self.widget_types: Counter[str] = Counter()
+        self.visualization_types: Counter[str] = Counter()
         self.template_variables: List[Dict[str, Any]] = []
+        # Query strings and types collected while walking widgets, counted in bulk afterwards
+        self._queries: List[str] = []
+        self._query_type_names: List[str] = []
 
         try:
             # Use validation module for secure file loading
@@ -44,112 +186,186 @@ class DatadogDashboard:
             raise DashboardParsingError(f"Error reading dashboard: {safe_error}")
 
     def validate_dashboard_structure(self) -> bool:
-        """Validate the basic structure of the dashboard JSON"""
-        if not isinstance(self.data, dict):
+        """
+        Validate the basic structure of the dashboard JSON
+
+        The structure is validated on construction, so this returns True once the
+        raw data has been parsed and released.
+        """
+        data = self.data
+        if data is None:
+            return True
+
+        if not isinstance(data, dict):
             raise DashboardParsingError("Dashboard data is not a valid JSON object")
 
-        if 'title' not in self.data:
+        if 'title' not in data:
             logger.warning("Dashboard has no title")
 
         # Check if it has the required sections
-        if 'widgets' not in self.data and 'graphs' not in self.data:
+        if 'widgets' not in data and 'graphs' not in data:
             raise DashboardParsingError.missing_structure("'widgets' or 'graphs'")
 
         return True
 
     def parse_dashboard(self) -> None:
-        """Parse dashboard data and extract relevant information"""
-        if 'widgets' in self.data:
-            self.is_valid = True
+        """
+        Parse dashboard data and extract relevant information
 
-            # Extract dashboard metadata
-            if 'title' in self.data:
-                self.title = self.data['title']
+        The raw data is released afterwards, so this runs once, on construction.
+        """
+        data = self.data
+        if data is None:
+            raise DashboardParsingError("Dashboard data has already been parsed and released")
 
-            if 'description' in self.data:
-                self.description = self.data['description']
+        if 'widgets' in data:
+            self.is_valid = True
 
-            if 'template_variables' in self.data:
-                self.template_variables = self.data['template_variables']
+            # Extract dashboard metadata
+            self.title = data.get('title', self.title)
+            self.description = data.get('description', self.description)
+            self.template_variables = data.get('template_variables', self.template_variables)
 
             # Process widgets
-            self.widgets = self.data['widgets']
-            self.process_widgets(self.widgets)
-        elif 'graphs' in self.data:
+            self.widgets = data['widgets']
+            self._process_all_widgets()
+        elif 'graphs' in data:
             # Handle older dashboard format
             self.is_valid = True
-            self.widgets = self.data['graphs']
-            self.process_widgets(self.widgets)
+            self.widgets = data['graphs']
+            self._process_all_widgets()
         else:
             raise DashboardParsingError.missing_structure("'widgets' or 'graphs'")
 
+        # Everything the report and converters use now lives in the attributes above
+        self.data = None
+
+    def _process_all_widgets(self) -> None:
+        """Analyze the dashboard's widgets, or only collect group and nested widgets when not analyzing"""
+        if self.analyze:
+            self.process_widgets(self.widgets)
+        else:
+            self.collect_widgets(self.widgets)
+
+    def collect_widgets(self, widgets: List[Dict[str, Any]], is_nested: bool = False) -> None:
+        """Collect group and nested widgets in document order without analyzing their queries"""
+        self._walk_widgets(widgets, is_nested, analyze=False)
+
     def process_widgets(self, widgets: List[Dict[str, Any]], is_nested: bool = False) -> None:
         """Process each widget and extract information"""
-        for widget in widgets:
+        self._walk_widgets(widgets, is_nested, analyze=True)
+
+    def _walk_widgets(self, widgets: List[Dict[str, Any]], is_nested: bool, analyze: bool) -> None:
+        """Collect group and nested widgets and, when analyzing, count widget, visualization and query types"""
+        widget_types: List[str] = []
+        viz_types: List[str] = []
+
+        # Bind hot-loop attribute lookups to locals once
+        add_widget_type = widget_types.append
+        add_viz_type = viz_types.append
+        add_group = self.group_widgets.append
+        add_nested = self.nested_widgets.append
+        stage_request = self._stage_request
+
+        # Walk nested groups with an explicit stack instead of recursion.
+        # Children are pushed in reverse so widgets are visited in document order.
+        stack = [(widget, is_nested) for widget in reversed(widgets)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            widget, nested = pop()
+            definition = widget.get('definition') if isinstance(widget, dict) else None
+            if definition is None:
+                continue
+
             # Store widget type information
-            if 'definition' in widget:
-                definition = widget['definition']
-                widget_type = definition.get('type', 'unknown')
-                self.widget_types[widget_type] += 1
-
-                # Handle nested widgets in groups
-                if widget_type == 'group' and 'widgets' in definition:
-                    self.group_widgets.append(widget)
-                    # Process nested widgets
-                    self.process_widgets(definition['widgets'], is_nested=True)
-                else:
-                    if is_nested:
-                        self.nested_widgets.append(widget)
-
-                    # Extract visualization type
-                    if 'viz' in definition:
-                        viz_type = definition['viz']
-                        self.visualization_types[viz_type] += 1
-
-                    # Count queries
-                    # Process widget requests
-                    if 'requests' in definition:
-                        requests = definition['requests']
-                        if isinstance(requests, list):
-                            for request in requests:
-                                self.process_request(request)
-                        elif isinstance(requests, dict):
-                            [self.process_request(r) for request_value in requests.values() for r in (request_value if isinstance(request_value, list) else [request_value]) if isinstance(r, dict)]
+            widget_type = _intern(definition.get('type', 'unknown'))
+            if analyze:
+                add_widget_type(widget_type)
+
+            # Handle nested widgets in groups
+            if widget_type == 'group' and 'widgets' in definition:
+                add_group(widget)
+                for child in reversed(definition['widgets']):
+                    push((child, True))
+                continue
+
+            if nested:
+                add_nested(widget)
+            if not analyze:
+                continue
+
+            # Extract visualization type
+            if 'viz' in definition:
+                add_viz_type(_intern(definition['viz']))
+
+            # Process widget requests
+            requests = definition.get('requests')
+            if requests is not None:
+                for request in _flatten_requests(requests):
+                    stage_request(request)
+
+        if analyze:
+            # Count everything in one C-level pass per counter
+            self.widget_types.update(widget_types)
+            self.visualization_types.update(viz_types)
+            self._count_queries()
 
     def process_request(self, request: Dict[str, Any]) -> None:
         """Process a request and extract query information"""
-        if 'q' in request:
+        self._stage_request(request)
+        self._count_queries()
+
+    def _stage_request(self, request: Dict[str, Any]) -> None:
+        """Collect a request's query strings and types for _count_queries to count in bulk"""
+        q = request.get('q')
+        queries = request.get('queries')
+        if q is None and queries is None:
+            # Nothing to count (e.g. note, image or iframe requests)
+            return
+
+        add_query = self._queries.append
+        add_query_type = self._query_type_names.append
+
+        if q is not None:
             self.total_queries += 1
-            query = request['q']
-            self.analyze_query(query)
+            # Only strings can name a metric source
+            if isinstance(q, str):
+                add_query(q)
 
             # Count query types
-            query_type = request.get('type', 'unknown')
-            self.query_types[query_type] += 1
+            add_query_type(request.get('type', 'unknown'))
 
         # Handle newer format with queries array
-        if 'queries' in request and isinstance(request['queries'], list):
-            for query_obj in request['queries']:
+        if isinstance(queries, list):
+            for query_obj in queries:
                 if 'query' in query_obj:
                     self.total_queries += 1
-                    self.analyze_query(query_obj['query'])
+                    query = query_obj['query']
+                    if isinstance(query, str):
+                        add_query(query)
 
-                    query_type = query_obj.get('name', 'unknown')
-                    self.query_types[query_type] += 1
+                    add_query_type(query_obj.get('name', 'unknown'))
+
+    def _count_queries(self) -> None:
+        """Fold the query strings and types collected by _stage_request into the counters"""
+        self.query_types.update(self._query_type_names)
+        self.analyze_queries(self._queries)
+        self._queries = []
+        self._query_type_names = []
 
     def analyze_query(self, query: str) -> None:
         """Analyze a query string to extract metric sources"""
-        # Extract metric sources
-        try:
-            if ':' in query:
-                parts = query.split(':')
-                if len(parts) > 1:
-                    metric_part = parts[1].split('{')[0]
-                    if '.' in metric_part:
-                        source = metric_part.split('.')[0]
-                        self.metric_sources[source] += 1
-        except ValueError as e:
-            logger.warning(f"Failed to analyze query due to a value error. Query: '{query}', Error: {type(e).__name__}: {e}")
+        source = _query_source(query)
+        if source is not None:
+            self.metric_sources[source] += 1
+
+    def analyze_queries(self, queries: List[str]) -> None:
+        """Extract metric sources from all collected query strings in one pass"""
+        # Dashboards repeat the same queries across widgets, so _query_source is memoized
+        self.metric_sources.update(
+            source for source in map(_query_source, queries) if source is not None
+        )
 
     def print_report(self) -> None:
         """
@@ -162,139 +378,102 @@ class DatadogDashboard:
         - Template variables and their details.
         - Hierarchical structure of widgets with nested details.
         """
+        sys.stdout.write(self.render_report())
+
+    def render_report(self) -> str:
+        """
+        Build the report printed by print_report and return it as a single string.
+
+        Returns an empty string (and logs an error) if the dashboard is invalid or
+        was loaded with analyze=False.
+        """
         if not self.is_valid:
             logger.error("Cannot generate report: Invalid dashboard")
-            return
+            return ""
+        if not self.analyze:
+            logger.error("Cannot generate report: Dashboard was loaded without analysis")
+            return ""
+
+        buf = io.StringIO()
+        write = buf.write
 
-        header = f"DASHBOARD ANALYSIS REPORT"
-        print("\n" + "="*80)
-        print(f"{header:^80}")
-        print("="*80)
+        write(f"\n{_SEP2}\n{_HDR}\n{_SEP2}\n")
 
-        print(f"Dashboard Title: {self.title}")
-        print(f"Source File: {self.dashboard_path}")
+        write(f"Dashboard Title: {self.title}\n")
+        write(f"Source File: {self.dashboard_path}\n")
 
         if self.description:
-            print("\nDescription:")
-            wrapped_desc = textwrap.fill(self.description.replace('\n', ' '), width=80)
-            print(f"{wrapped_desc}")
+            write("\nDescription:\n")
+            description = self.description
+            # A short single-line description comes back from fill() unchanged
+            if len(description) <= 80 and description.isprintable() and description == description.strip():
+                write(f"{description}\n")
+            else:
+                import textwrap
 
-        print("\n" + "-"*80)
-        print("SUMMARY STATISTICS")
-        print("-"*80)
+                wrapped_desc = textwrap.fill(description.replace('\n', ' '), width=80)
+                write(f"{wrapped_desc}\n")
 
-        print(f"Total Widgets: {len(self.widgets)}")
-        print(f"   - Group Widgets: {len(self.group_widgets)}")
-        print(f"   - Nested Widgets: {len(self.nested_widgets)}")
-        print(f"Total Queries: {self.total_queries}")
-        print(f"Template Variables: {len(self.template_variables)}")
+        write(f"\n{_SEP}\nSUMMARY STATISTICS\n{_SEP}\n")
 
-        print("\n" + "-"*80)
-        print("WIDGET TYPES")
-        print("-"*80)
+        write(f"Total Widgets: {len(self.widgets)}\n")
+        write(f"   - Group Widgets: {len(self.group_widgets)}\n")
+        write(f"   - Nested Widgets: {len(self.nested_widgets)}\n")
+        write(f"Total Queries: {self.total_queries}\n")
+        write(f"Template Variables: {len(self.template_variables)}\n")
 
-        for widget_type, count in sorted(self.widget_types.items(), key=itemgetter(1), reverse=True):
-            print(f"  - {widget_type}: {count}")
+        write(f"\n{_SEP}\nWIDGET TYPES\n{_SEP}\n")
+
+        write(''.join(f"  - {widget_type}: {count}\n" for widget_type, count in self.widget_types.most_common()))
 
         if self.visualization_types:
-            print("\n" + "-"*80)
-            print("VISUALIZATION TYPES")
-            print("-"*80)
+            write(f"\n{_SEP}\nVISUALIZATION TYPES\n{_SEP}\n")
 
-            for viz_type, count in sorted(self.visualization_types.items(), key=lambda x: x[1], reverse=True):
-                print(f"  - {viz_type}: {count}")
+            write(''.join(f"  - {viz_type}: {count}\n" for viz_type, count in self.visualization_types.most_common()))
 
-        print("\n" + "-"*80)
-        print("QUERY TYPES")
-        print("-"*80)
+        write(f"\n{_SEP}\nQUERY TYPES\n{_SEP}\n")
 
-        for query_type, count in sorted(self.query_types.items(), key=lambda x: x[1], reverse=True):
-            print(f"  - {query_type}: {count}")
+        write(''.join(f"  - {query_type}: {count}\n" for query_type, count in self.query_types.most_common()))
 
-        print("\n" + "-"*80)
-        print("METRIC SOURCES")
-        print("-"*80)
+        write(f"\n{_SEP}\nMETRIC SOURCES\n{_SEP}\n")
 
-        for source, count in sorted(self.metric_sources.items(), key=lambda x: x[1], reverse=True):
-            print(f"  - {source}: {count}")
+        write(''.join(f"  - {source}: {count}\n" for source, count in self.metric_sources.most_common()))
 
         if self.template_variables:
-            print("\n" + "-"*80)
-            print("TEMPLATE VARIABLES")
-            print("-"*80)
-
-            for var in self.template_variables:
-                print(f"  - {var['name']} (prefix: {var.get('prefix', 'none')}, default: {var.get('default', '*')})")
-
-        print("\n" + "-"*80)
-        print("DASHBOARD STRUCTURE")
-        print("-"*80)
-
-        self.print_widget_hierarchy(self.widgets)
-
-        print("\n" + "="*80)
-
-    def print_widget_hierarchy(self, widgets: List[Dict[str, Any]], indent: int = 0) -> None:
-        """Print the widget hierarchy with indentation"""
-        for i, widget in enumerate(widgets):
-            if 'definition' in widget:
-                definition = widget['definition']
-                widget_type = definition.get('type', 'unknown')
-                title = definition.get('title', '[No title]')
-
-                print(f"{' ' * indent}Widget {i+1}: {title} ({widget_type})")
-
-                # For group widgets, recursively print their children
-                if widget_type == 'group' and 'widgets' in definition:
-                    print(f"{' ' * (indent+2)}Group contains {len(definition['widgets'])} widgets:")
-                    self.print_widget_hierarchy(definition['widgets'], indent + 4)
-
-                # Print query information for visualization widgets
-                if 'requests' in definition:
-                    if isinstance(definition['requests'], list):
-                        print(f"{' ' * (indent+2)}Queries ({len(definition['requests'])}):")
-                        for j, request in enumerate(definition['requests']):
-                            self.print_request_info(request, indent + 4, j)
-                    elif isinstance(definition['requests'], dict):
-                        print(f"{' ' * (indent+2)}Queries (dictionary format):")
-                        for key, request in definition['requests'].items():
-                            if isinstance(request, dict):
-                                self.print_request_info(request, indent + 4, key)
-                            elif isinstance(request, list):
-                                print(f"{' ' * (indent+4)}{key} ({len(request)} queries)")
-                                for j, r in enumerate(request):
-                                    self.print_request_info(r, indent + 6, j)
-
-    def print_request_info(self, request: Dict[str, Any], indent: int, index: Union[int, str]) -> None:
+            write(f"\n{_SEP}\nTEMPLATE VARIABLES\n{_SEP}\n")
+
+            write(''.join(
+                f"  - {var['name']} (prefix: {var.get('prefix', 'none')}, default: {var.get('default', '*')})\n"
+                for var in self.template_variables
+            ))
+
+        write(f"\n{_SEP}\nDASHBOARD STRUCTURE\n{_SEP}\n")
+
+        self.print_widget_hierarchy(buf=buf)
+
+        write(f"\n{_SEP2}\n")
+
+        return buf.getvalue()
+
+    def print_widget_hierarchy(
+        self, widgets: Optional[List[Dict[str, Any]]] = None, indent: int = 0, buf: Optional[TextIO] = None
+    ) -> None:
+        """
+        Print the widget hierarchy with indentation to buf (stdout by default)
+
+        Prints the dashboard's widgets unless a widget list is given.
+        """
+        if widgets is None:
+            widgets = self.widgets
+        (sys.stdout if buf is None else buf).write(_format_widget_hierarchy(widgets, indent))
+
+    def print_request_info(
+        self, request: Dict[str, Any], indent: int, index: Union[int, str], buf: Optional[TextIO] = None
+    ) -> None:
         """
         Print information about a request, including queries, subqueries, and formulas.
 
         If the request contains a 'formulas' key, each formula is displayed with its
-        formula text and alias (if available).
+        formula text and alias (if available). Output goes to buf (stdout by default).
         """
-        if 'q' in request:
-            print(f"{' ' * indent}Query {index}: {request['q']}")
-            if 'aggregator' in request:
-                print(f"{' ' * (indent+2)}Aggregator: {request['aggregator']}")
-            if 'type' in request:
-                print(f"{' ' * (indent+2)}Type: {request['type']}")
-
-        # Handle newer format with queries array
-        if 'queries' in request and isinstance(request['queries'], list):
-            for i, query_obj in enumerate(request['queries']):
-                if 'query' in query_obj:
-                    print(f"{' ' * indent}Subquery {i+1}: {query_obj['query']}")
-                    if 'data_source' in query_obj:
-                        print(f"{' ' * (indent+2)}Data Source: {query_obj['data_source']}")
-                    if 'name' in query_obj:
-                        print(f"{' ' * (indent+2)}Name: {query_obj['name']}")
-                    if 'aggregator' in query_obj:
-                        print(f"{' ' * (indent+2)}Aggregator: {query_obj['aggregator']}")
-
-        # Handle formulas
-        if 'formulas' in request and isinstance(request['formulas'], list):
-            for i, formula in enumerate(request['formulas']):
-                if 'formula' in formula:
-                    alias = formula.get('alias', '')
-                    formula_text = formula['formula']
-                    print(f"{' ' * indent}Formula {i+1}: {formula_text} (alias: {alias})")
\ No newline at end of file
+        (sys.stdout if buf is None else buf).write(_format_request(request, indent, index))
@@ -1,20 +1,37 @@
 #!/usr/bin/env python3
 
-import json
+import secrets
 import sys
-from collections import defaultdict
-import uuid
-import copy
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 
+from graang.datadog_dashboard import DatadogDashboard
 from graang.errors import ConversionError, FileOperationError
-from graang.utils import convert_requests_to_targets, build_grafana_target, convert_datadog_query_to_prometheus, GridLayoutCalculator
+from graang.utils import build_grafana_dashboard, convert_requests_to_targets, convert_template_variables, build_grafana_target, convert_datadog_query_to_prometheus, dump_json, GridLayoutCalculator, WRITE_BUFFER_SIZE
 from graang.validation import PathValidator, InputSanitizer
 from graang.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Datasource references used by converted panels. Each panel gets its own copy
+# so editing one panel's datasource leaves the others alone.
+_PROMETHEUS_DATASOURCE: Dict[str, str] = {"type": "prometheus", "uid": "prometheus"}
+_LOKI_DATASOURCE: Dict[str, str] = {"type": "loki", "uid": "loki"}
+
 class DatadogToGrafanaConverter:
+    # No instance __dict__: patch or override the _convert_* methods on the class or a subclass
+    __slots__ = ('datadog', 'grafana', 'panel_id', 'grid_layout')
+
+    # Datadog widget type -> name of the method that fills in the Grafana panel
+    _WIDGET_CONVERTERS: Dict[str, str] = {
+        'timeseries': '_convert_timeseries',
+        'query_value': '_convert_query_value',
+        'toplist': '_convert_toplist',
+        'note': '_convert_note',
+        'heatmap': '_convert_heatmap',
+        'hostmap': '_convert_hostmap',
+        'event_stream': '_convert_event_stream',
+    }
+
     def __init__(self, datadog_dashboard: Any) -> None:  # Using Any for now since we'll import later
         """
         Initialize converter with a DatadogDashboard instance
@@ -23,38 +40,9 @@ class DatadogToGrafanaConverter:
             datadog_dashboard: An instance of the DatadogDashboard class
         """
         self.datadog = datadog_dashboard
-        self.grafana: Dict[str, Any] = {
-            "id": None,
-            "uid": str(uuid.uuid4())[:8],
-            "title": self.datadog.title,
-            "tags": ["converted-from-datadog"],
-            "timezone": "browser",
-            "schemaVersion": 36,
-            "version": 1,
-            "refresh": "5s",
-            "time": {
-                "from": "now-6h",
-                "to": "now"
-            },
-            "panels": [],
-            "templating": {
-                "list": []
-            },
-            "annotations": {
-                "list": [{
-                    "builtIn": 1,
-                    "datasource": {
-                        "type": "grafana",
-                        "uid": "-- Grafana --"
-                    },
-                    "enable": True,
-                    "hide": True,
-                    "iconColor": "rgba(0, 211, 255, 1)",
-                    "name": "Annotations & Alerts",
-                    "type": "dashboard"
-                }]
-            }
-        }
+        self.grafana: Dict[str, Any] = build_grafana_dashboard(
+            self.datadog.title, secrets.token_hex(4), ["converted-from-datadog"]
+        )
 
         # Keep track of panel positioning
         self.panel_id: int = 1
@@ -71,9 +59,7 @@ class DatadogToGrafanaConverter:
         self._convert_template_variables()
 
         # Convert widgets to panels
-        all_widgets = self._flatten_widgets()
-
-        for widget in all_widgets:
+        for widget in self._flatten_widgets():
             panel = self._convert_widget_to_panel(widget)
             if panel:
                 self.grafana["panels"].append(panel)
@@ -94,9 +80,9 @@ class DatadogToGrafanaConverter:
             # Validate output path for security
             validated_path = PathValidator.validate_output_path(output_path)
 
-            with open(validated_path, 'w', encoding='utf-8') as f:
-                json.dump(self.grafana, f, indent=2)
-            logger.info(f"Grafana dashboard saved to {validated_path}")
+            with open(validated_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                dump_json(self.grafana, f)
+            logger.info("Grafana dashboard saved to %s", validated_path)
             return True
         except FileOperationError:
             # Re-raise validation errors
@@ -115,48 +101,16 @@ class DatadogToGrafanaConverter:
 
     def _convert_template_variables(self) -> None:
         """Convert Datadog template variables to Grafana format"""
-        for var in self.datadog.template_variables:
-            grafana_var = {
-                "name": var.get("name", ""),
-                "type": "custom",
-                "datasource": {
-                    "type": "prometheus",
-                    "uid": "prometheus"
-                },
-                "current": {},
-                "options": [],
-                "query": "",
-                "skipUrlSync": False,
-                "hide": 0
-            }
-
-            # Handle different variable types
-            if "prefix" in var:
-                grafana_var["query"] = var.get("prefix", "")
-
-            # Add values if available
-            if "default" in var:
-                grafana_var["current"] = {"value": var["default"], "text": var["default"]}
-
-            if "values" in var:
-                for value in var["values"]:
-                    grafana_var["options"].append({"text": value, "value": value})
-
-            self.grafana["templating"]["list"].append(grafana_var)
-
-    def _flatten_widgets(self) -> List[Dict[str, Any]]:
-        """Get a flat list of widgets including those in groups"""
-        flat_widgets: List[Dict[str, Any]] = []
-
-        # Add top-level widgets that aren't groups
-        for widget in self.datadog.widgets:
-            if 'definition' in widget and widget['definition'].get('type') != 'group':
-                flat_widgets.append(widget)
+        self.grafana["templating"]["list"].extend(convert_template_variables(self.datadog.template_variables))
 
-        # Add nested widgets from groups
-        flat_widgets.extend(self.datadog.nested_widgets)
-
-        return flat_widgets
+    def _flatten_widgets(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the widgets to convert, including those in groups"""
+        # Top-level widgets that aren't groups, then the nested widgets from groups
+        for widget in self.datadog.widgets:
+            definition = widget.get('definition') if isinstance(widget, dict) else None
+            if definition is not None and definition.get('type') != 'group':
+                yield widget
+        yield from self.datadog.nested_widgets
 
     def _convert_widget_to_panel(self, widget: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -168,15 +122,15 @@ class DatadogToGrafanaConverter:
         Returns:
             dict: Grafana panel configuration or None if conversion not supported
         """
-        if 'definition' not in widget:
+        definition = widget.get('definition') if isinstance(widget, dict) else None
+        if definition is None:
             return None
 
-        definition = widget['definition']
         widget_type = definition.get('type', 'unknown')
 
         # Set up the base panel structure
-        # Get title from the widget definition if available
-        title = definition.get('title', widget.get('title', 'Untitled Panel'))
+        # Get title from the widget definition if available, only then from the widget
+        title = definition['title'] if 'title' in definition else widget.get('title', 'Untitled Panel')
 
         panel = {
             "id": self.panel_id,
@@ -186,20 +140,10 @@ class DatadogToGrafanaConverter:
         self.panel_id += 1
 
         # Handle different widget types
-        if widget_type == 'timeseries':
-            self._convert_timeseries(definition, panel)
-        elif widget_type == 'query_value':
-            self._convert_query_value(definition, panel)
-        elif widget_type == 'toplist':
-            self._convert_toplist(definition, panel)
-        elif widget_type == 'note':
-            self._convert_note(definition, panel)
-        elif widget_type == 'heatmap':
-            self._convert_heatmap(definition, panel)
-        elif widget_type == 'hostmap':
-            self._convert_hostmap(definition, panel)
-        elif widget_type == 'event_stream':
-            self._convert_event_stream(definition, panel)
+        converter_name = self._WIDGET_CONVERTERS.get(widget_type)
+        if converter_name is not None:
+            # Looked up per call so overrides and patches of the methods take effect
+            getattr(self, converter_name)(definition, panel)
         else:
             # Default to a text panel for unsupported types
             panel.update({
@@ -218,36 +162,29 @@ class DatadogToGrafanaConverter:
         """Convert a Datadog timeseries widget to a Grafana timeseries panel"""
         panel.update({
             "type": "timeseries",
-            "datasource": {
-                "type": "prometheus",
-                "uid": "prometheus"
-            },
+            "datasource": _PROMETHEUS_DATASOURCE.copy(),
             "options": {
                 "legend": {"showLegend": True},
                 "tooltip": {"mode": "single", "sort": "none"}
             },
-            "targets": self._convert_requests_to_targets(definition.get('requests', []))
+            "targets": convert_requests_to_targets(definition.get('requests', ()), "prometheus")
         })
 
         # Handle visualization options
-        if 'viz' in definition:
-            viz_type = definition['viz']
-            if viz_type == 'line':
-                panel["options"]["drawStyle"] = "line"
-            elif viz_type == 'area':
-                panel["options"]["drawStyle"] = "line"
-                panel["options"]["fillOpacity"] = 25
-            elif viz_type == 'bar':
-                panel["options"]["drawStyle"] = "bars"
+        viz_type = definition.get('viz')
+        if viz_type == 'line':
+            panel["options"]["drawStyle"] = "line"
+        elif viz_type == 'area':
+            panel["options"]["drawStyle"] = "line"
+            panel["options"]["fillOpacity"] = 25
+        elif viz_type == 'bar':
+            panel["options"]["drawStyle"] = "bars"
 
     def _convert_query_value(self, definition: Dict[str, Any], panel: Dict[str, Any]) -> None:
         """Convert a Datadog query_value widget to a Grafana stat panel"""
         panel.update({
             "type": "stat",
-            "datasource": {
-                "type": "prometheus",
-                "uid": "prometheus"
-            },
+            "datasource": _PROMETHEUS_DATASOURCE.copy(),
             "options": {
                 "textMode": "value",
                 "colorMode": "value",
@@ -260,17 +197,14 @@ class DatadogToGrafanaConverter:
                     "fields": ""
                 }
             },
-            "targets": self._convert_requests_to_targets(definition.get('requests', []))
+            "targets": convert_requests_to_targets(definition.get('requests', ()), "prometheus")
         })
 
     def _convert_toplist(self, definition: Dict[str, Any], panel: Dict[str, Any]) -> None:
         """Convert a Datadog toplist widget to a Grafana bar gauge panel"""
         panel.update({
             "type": "bargauge",
-            "datasource": {
-                "type": "prometheus",
-                "uid": "prometheus"
-            },
+            "datasource": _PROMETHEUS_DATASOURCE.copy(),
             "options": {
                 "orientation": "horizontal",
                 "displayMode": "basic",
@@ -280,7 +214,7 @@ class DatadogToGrafanaConverter:
                     "fields": ""
                 }
             },
-            "targets": self._convert_requests_to_targets(definition.get('requests', []))
+            "targets": convert_requests_to_targets(definition.get('requests', ()), "prometheus")
         })
 
     def _convert_note(self, definition: Dict[str, Any], panel: Dict[str, Any]) -> None:
@@ -295,32 +229,23 @@ class DatadogToGrafanaConverter:
         """Convert a Datadog heatmap widget to a Grafana heatmap panel"""
         panel.update({
             "type": "heatmap",
-            "datasource": {
-                "type": "prometheus",
-                "uid": "prometheus"
-            },
-            "targets": self._convert_requests_to_targets(definition.get('requests', []))
+            "datasource": _PROMETHEUS_DATASOURCE.copy(),
+            "targets": convert_requests_to_targets(definition.get('requests', ()), "prometheus")
         })
 
     def _convert_hostmap(self, definition: Dict[str, Any], panel: Dict[str, Any]) -> None:
         """Convert a Datadog hostmap widget to a Grafana table panel"""
         panel.update({
             "type": "table",
-            "datasource": {
-                "type": "prometheus",
-                "uid": "prometheus"
-            },
-            "targets": self._convert_requests_to_targets(definition.get('requests', []))
+            "datasource": _PROMETHEUS_DATASOURCE.copy(),
+            "targets": convert_requests_to_targets(definition.get('requests', ()), "prometheus")
         })
 
     def _convert_event_stream(self, definition: Dict[str, Any], panel: Dict[str, Any]) -> None:
         """Convert a Datadog event_stream widget to a Grafana logs panel"""
         panel.update({
             "type": "logs",
-            "datasource": {
-                "type": "loki",
-                "uid": "loki"
-            },
+            "datasource": _LOKI_DATASOURCE.copy(),
             "targets": [
                 {
                     "expr": "{}",
@@ -355,9 +280,6 @@ class DatadogToGrafanaConverter:
         return convert_datadog_query_to_prometheus(query)
 
 
-from graang.datadog_dashboard import DatadogDashboard
-
-
 class GrafanaDashboardExporter:
     """Helper class to export a Grafana dashboard"""
 
@@ -375,7 +297,7 @@ class GrafanaDashboardExporter:
         """
         try:
             # Create an instance of DatadogDashboard
-            dd_dashboard = DatadogDashboard(datadog_dashboard_path)
+            dd_dashboard = DatadogDashboard(datadog_dashboard_path, analyze=False)
 
             if not dd_dashboard.is_valid:
                 sys.stderr.write("Error: Invalid Datadog dashboard\n")
@@ -396,6 +318,27 @@ class GrafanaDashboardExporter:
             sys.stderr.write(f"Unexpected error exporting Grafana dashboard: {str(e)}\n")
             return False
 
+    @staticmethod
+    def export_many(paths: List[Tuple[str, str]], max_workers: Optional[int] = None) -> List[bool]:
+        """
+        Convert several Datadog dashboards in parallel worker processes
+
+        Args:
+            paths: (Datadog dashboard path, Grafana output path) pairs
+            max_workers: Number of worker processes (defaults to the CPU count)
+
+        Returns:
+            list: The export result for each pair, in the order of paths
+        """
+        if not paths:
+            return []
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        input_paths, output_paths = zip(*paths)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(GrafanaDashboardExporter.export, input_paths, output_paths))
+
 
 def main() -> None:
     """Main entry point for the graang command-line tool"""
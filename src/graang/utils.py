@@ -1,24 +1,167 @@
 """Utility functions for the Graang project."""
 
+import json
 import re
-from typing import Dict, List, Any, Optional, Union
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Any, Optional, Union, cast
 
+# orjson is an optional speedup; typed as Any so this checks with or without it
+orjson: Any
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+else:
+    orjson = _orjson
 
+# Buffer size for writing converted dashboards; the stdlib fallback in
+# dump_json produces many small chunks, so a larger buffer saves syscalls
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Patterns used by convert_datadog_query_to_prometheus, compiled once
+_TAG_FILTER_RE = re.compile(r'\{[^}]+\}')
+_TIME_RANGE_RE = re.compile(r'\[\w+\]')
+
+
+def _double_braces(match: "re.Match[str]") -> str:
+    """Wrap a matched tag filter in a second pair of braces"""
+    # A callback avoids re's template expansion, which costs more than the match itself
+    return '{' + match.group() + '}'
+
+
+def loads_json(data: bytes) -> Any:
+    """
+    Parse a JSON document from raw bytes
+
+    The data must be UTF-8: a byte order mark is a ``json.JSONDecodeError`` and
+    other encodings raise ``UnicodeDecodeError``. Uses orjson when it is
+    installed; documents orjson rejects, such as those containing ``NaN`` or
+    ``Infinity``, are parsed again by the standard library, so either backend
+    accepts and rejects the same input with the same errors.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data.decode('utf-8'))
+
+
+def dumps_json(data: Any) -> bytes:
+    """
+    Serialize data as UTF-8 encoded JSON indented by two spaces
+
+    Uses orjson when it is installed and falls back to the standard library
+    otherwise; both produce the same layout.
+    """
+    if orjson is not None:
+        return cast(bytes, orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def dump_json(data: Any, fp: BinaryIO) -> None:
+    """
+    Write data to a binary file in the same format as dumps_json
+
+    orjson serializes the whole document in one C call. Without it the stdlib
+    encoder's chunks are written as they are produced, so the full document is
+    never held in memory as both str and bytes.
+    """
+    if orjson is not None:
+        fp.write(dumps_json(data))
+        return
+    write = fp.write
+    for chunk in json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(data):
+        write(chunk.encode('utf-8'))
+
+
+def build_grafana_dashboard(
+    title: str,
+    uid: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    time_from: str = "now-6h",
+    time_to: str = "now"
+) -> Dict[str, Any]:
+    """
+    Build an empty Grafana dashboard with the built-in annotations entry
+
+    A fresh dict is built on every call; it is several times cheaper than
+    deep-copying a shared template and leaves no state shared between dashboards.
+    """
+    return {
+        "id": None,
+        "uid": uid,
+        "title": title,
+        "tags": tags if tags is not None else [],
+        "timezone": "browser",
+        "schemaVersion": 36,
+        "version": 1,
+        "refresh": "5s",
+        "time": {
+            "from": time_from,
+            "to": time_to
+        },
+        "panels": [],
+        "templating": {
+            "list": []
+        },
+        "annotations": {
+            "list": [{
+                "builtIn": 1,
+                "datasource": {
+                    "type": "grafana",
+                    "uid": "-- Grafana --"
+                },
+                "enable": True,
+                "hide": True,
+                "iconColor": "rgba(0, 211, 255, 1)",
+                "name": "Annotations & Alerts",
+                "type": "dashboard"
+            }]
+        }
+    }
+
+
+def convert_template_variables(template_variables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert Datadog template variables to Grafana custom variables"""
+    # Missing prefix, default or values leave the query, current value and options empty
+    return [
+        {
+            "name": var.get("name", ""),
+            "type": "custom",
+            "datasource": {
+                "type": "prometheus",
+                "uid": "prometheus"
+            },
+            "current": {"value": var["default"], "text": var["default"]} if "default" in var else {},
+            "options": [{"text": value, "value": value} for value in var.get("values", ())],
+            "query": var.get("prefix", ""),
+            "skipUrlSync": False,
+            "hide": 0
+        }
+        for var in template_variables
+    ]
+
+
+@lru_cache(maxsize=4096)
 def convert_datadog_query_to_prometheus(query: str) -> str:
     """
     Convert a Datadog query to Prometheus format
 
-    This is a simplified conversion - complex queries would need more detailed mapping
+    This is a simplified conversion - complex queries would need more detailed mapping.
+    Results are cached since dashboards often repeat the same query across widgets.
     """
     # Basic replacements
     # Replace common Datadog functions with Prometheus equivalents
-    query = re.sub(r'avg:', 'avg_over_time(', query)
-    query = re.sub(r'sum:', 'sum(', query)
-    query = re.sub(r'min:', 'min_over_time(', query)
-    query = re.sub(r'max:', 'max_over_time(', query)
+    query = (
+        query.replace('avg:', 'avg_over_time(')
+        .replace('sum:', 'sum(')
+        .replace('min:', 'min_over_time(')
+        .replace('max:', 'max_over_time(')
+    )
 
     # Replace tag filters
-    query = re.sub(r'\{([^}]+)\}', r'{{\1}}', query)
+    query = _TAG_FILTER_RE.sub(_double_braces, query)
 
     # Add closing parentheses if needed
     open_parens = query.count('(')
@@ -26,8 +169,8 @@ def convert_datadog_query_to_prometheus(query: str) -> str:
     if open_parens > close_parens:
         query += ')' * (open_parens - close_parens)
 
-    # Add a time range if it doesn't have one
-    if not re.search(r'\[\w+\]', query):
+    # Add a time range if it doesn't have one; most queries have no '[' at all
+    if '[' not in query or not _TIME_RANGE_RE.search(query):
         query += '[5m]'
 
     return query
@@ -82,25 +225,27 @@ def convert_requests_to_targets(
         list: Grafana target configurations
     """
     targets: List[Dict[str, Any]] = []
+    append = targets.append
 
-    if isinstance(requests, dict):
-        # Handle dictionary format
+    # The list format is the common one, so it is checked first
+    if isinstance(requests, list):
+        # Handle list format
+        for i, request in enumerate(requests):
+            target = build_grafana_target(request, datasource, f"A{i}")
+            if target:
+                append(target)
+    elif isinstance(requests, dict):
+        # Handle dictionary format; values may mix lists and single requests
         for key, request_items in requests.items():
             if isinstance(request_items, list):
                 for i, request in enumerate(request_items):
                     target = build_grafana_target(request, datasource, f"{key}_{i}")
                     if target:
-                        targets.append(target)
+                        append(target)
             elif isinstance(request_items, dict):
                 target = build_grafana_target(request_items, datasource, key)
                 if target:
-                    targets.append(target)
-    elif isinstance(requests, list):
-        # Handle list format
-        for i, request in enumerate(requests):
-            target = build_grafana_target(request, datasource, f"A{i}")
-            if target:
-                targets.append(target)
+                    append(target)
 
     return targets
 
@@ -108,6 +253,8 @@ def convert_requests_to_targets(
 class GridLayoutCalculator:
     """Class to handle grid layout calculations for Grafana panels"""
 
+    __slots__ = ('x', 'y', 'max_x', 'current_row_height')
+
     def __init__(self):
         self.x = 0
         self.y = 0
@@ -121,13 +268,14 @@ class GridLayoutCalculator:
         height = 8
 
         # Try to extract size information from the widget
-        if 'layout' in widget and 'width' in widget['layout'] and 'height' in widget['layout']:
+        layout = widget.get('layout')
+        if layout is not None and 'width' in layout and 'height' in layout:
             # Datadog uses percentages, Grafana uses a 24-unit grid
-            width_percent = widget['layout'].get('width', 50)
+            width_percent = layout['width']
             width = max(1, min(24, round((width_percent / 100) * 24)))
 
             # Height is in units, typically 4-12 range in Grafana
-            height_percent = widget['layout'].get('height', 25)
+            height_percent = layout['height']
             height = max(4, min(36, round((height_percent / 100) * 24)))
         else:
             # For important panels (like timeseries, query_value), try to make them span full width
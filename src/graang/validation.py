@@ -8,9 +8,10 @@ such as path traversal, resource exhaustion, and injection attacks.
 import os
 import json
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable
 from graang.errors import FileOperationError, DashboardParsingError
 from graang.logging_config import get_logger
+from graang.utils import loads_json
 
 logger = get_logger(__name__)
 
@@ -164,7 +165,7 @@ class JSONValidator:
         Args:
             data: The JSON data to check
             max_depth: Maximum allowed depth
-            current_depth: Current recursion depth
+            current_depth: Depth of ``data`` itself
 
         Returns:
             int: The maximum depth found
@@ -172,28 +173,39 @@ class JSONValidator:
         Raises:
             DashboardParsingError: If depth exceeds maximum
         """
-        if current_depth > max_depth:
+        max_found = current_depth
+        # Walk containers with an explicit stack instead of recursing per node;
+        # scalars are accounted for inline since they add no further depth.
+        stack = [(data, current_depth)]
+        while stack:
+            node, depth = stack.pop()
+            if depth > max_found:
+                max_found = depth
+                if max_found > max_depth:
+                    break
+
+            children: Iterable[Any]
+            if isinstance(node, dict):
+                children = node.values()
+            elif isinstance(node, list):
+                children = node
+            else:
+                continue
+
+            child_depth = depth + 1
+            for child in children:
+                if isinstance(child, (dict, list)):
+                    stack.append((child, child_depth))
+                elif child_depth > max_found:
+                    max_found = child_depth
+
+        if max_found > max_depth:
             raise DashboardParsingError(
                 f"JSON structure too deeply nested (max depth: {max_depth}). "
                 f"This may indicate a malformed or malicious file."
             )
 
-        if isinstance(data, dict):
-            if not data:
-                return current_depth
-            return max(
-                JSONValidator.check_json_depth(value, max_depth, current_depth + 1)
-                for value in data.values()
-            )
-        elif isinstance(data, list):
-            if not data:
-                return current_depth
-            return max(
-                JSONValidator.check_json_depth(item, max_depth, current_depth + 1)
-                for item in data
-            )
-        else:
-            return current_depth
+        return max_found
 
     @staticmethod
     def load_and_validate_json(file_path: Path) -> Dict[str, Any]:
@@ -210,9 +222,9 @@ class JSONValidator:
             DashboardParsingError: If the JSON is invalid or unsafe
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                # Load JSON
-                data = json.load(f)
+            # Read raw bytes and let the parser handle UTF-8 decoding
+            with open(file_path, 'rb') as f:
+                data = loads_json(f.read())
         except json.JSONDecodeError as e:
             raise DashboardParsingError.invalid_json(str(file_path), str(e))
         except UnicodeDecodeError as e:
@@ -0,0 +1,146 @@
+"""Tests for the graang-analyze command line interface."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from graang.datadog_dash_translator import _expand_dashboard_paths, analyze_dashboards, main
+
+
+def write_dashboard(directory, name, dashboard_data):
+    """Write dashboard data as a JSON file in directory and return its path."""
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dashboard_data, f)
+    return path
+
+
+def run_main(argv):
+    """Run graang-analyze with argv and return (exit code, stdout, stderr)."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    with patch('sys.argv', ['graang-analyze'] + argv), patch('sys.stdout', stdout), patch('sys.stderr', stderr):
+        try:
+            main()
+        except SystemExit as e:
+            code = e.code
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+class TestMultipleDashboards(unittest.TestCase):
+    """Test analyzing several dashboards in one run."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.dir = self.tmpdir.name
+
+    def test_expand_directories_in_name_order(self):
+        """Test directories expand to their JSON files sorted by name, in argument order."""
+        dashboards = os.path.join(self.dir, "dashboards")
+        os.mkdir(dashboards)
+        second = write_dashboard(dashboards, "b.json", {"widgets": []})
+        first = write_dashboard(dashboards, "a.json", {"widgets": []})
+        write_dashboard(dashboards, "notes.txt", {})
+        single = write_dashboard(self.dir, "single.json", {"widgets": []})
+
+        self.assertEqual(_expand_dashboard_paths([single, dashboards]), [single, first, second])
+
+    def test_reports_follow_argument_order(self):
+        """Test reports are printed in the order of the paths, whichever worker finishes first."""
+        paths = [
+            write_dashboard(self.dir, f"{name}.json", {"title": f"Dashboard {name}", "widgets": []})
+            for name in ("c", "a", "b")
+        ]
+        stdout = io.StringIO()
+
+        with patch('sys.stdout', stdout):
+            self.assertTrue(analyze_dashboards(paths))
+
+        output = stdout.getvalue()
+        positions = [output.index(f"Dashboard Title: Dashboard {name}") for name in ("c", "a", "b")]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_bad_dashboard_exits_with_error(self):
+        """Test a dashboard that fails to parse is reported on stderr and the exit status is 1."""
+        good = write_dashboard(self.dir, "good.json", {"title": "Good", "widgets": []})
+        bad = write_dashboard(self.dir, "bad.json", {"title": "Bad"})
+
+        code, stdout, stderr = run_main([good, bad])
+
+        self.assertEqual(code, 1)
+        self.assertIn("Dashboard Title: Good", stdout)
+        self.assertIn(f"Error: {bad}:", stderr)
+
+    def test_empty_directory_is_rejected(self):
+        """Test a directory without JSON files is a usage error."""
+        code, _, stderr = run_main([self.dir])
+
+        self.assertEqual(code, 2)
+        self.assertIn("no dashboard JSON files found", stderr)
+
+    def test_single_file_options_are_rejected(self):
+        """Test --convert and --output are usage errors with several dashboards."""
+        paths = [write_dashboard(self.dir, f"{name}.json", {"widgets": []}) for name in ("a", "b")]
+
+        for option in (["--convert"], ["-o", os.path.join(self.dir, "out.json")]):
+            with self.subTest(option=option):
+                code, stdout, stderr = run_main(paths + option)
+
+                self.assertEqual(code, 2)
+                self.assertIn("takes a single dashboard file", stderr)
+                self.assertEqual(stdout, "")
+
+
+class TestSingleDashboard(unittest.TestCase):
+    """Test analyzing a single dashboard."""
+
+    def test_missing_file_exits_with_error(self):
+        """Test a file that cannot be read is reported on stderr and the exit status is 1."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            missing = os.path.join(tmpdir, 'missing.json')
+
+            code, stdout, stderr = run_main([missing])
+
+        self.assertEqual(code, 1)
+        self.assertEqual(stdout, "")
+        self.assertTrue(stderr.startswith("Error: "))
+
+
+class TestConvertOutput(unittest.TestCase):
+    """Test printing the converted dashboard."""
+
+    def test_convert_to_non_utf8_stdout(self):
+        """Test non-ASCII titles are written as UTF-8 even when stdout is ASCII."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_dashboard(tmpdir, 'cafe.json', {"title": "Café", "widgets": []})
+            stdout = io.TextIOWrapper(io.BytesIO(), encoding='ascii')
+
+            with patch('sys.argv', ['graang-analyze', path, '-c']), patch('sys.stdout', stdout):
+                main()
+
+            stdout.flush()
+            output = json.loads(stdout.buffer.getvalue().decode('utf-8'))
+        self.assertEqual(output["title"], "Café")
+
+    def test_convert_skips_malformed_widgets(self):
+        """Test widget entries that are not objects produce no panels."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_dashboard(tmpdir, 'malformed.json', {
+                "widgets": ["oops", None, {"definition": {"type": "timeseries", "title": "CPU"}}]
+            })
+            output = os.path.join(tmpdir, 'out.json')
+
+            code, _, _ = run_main([path, '-c', '-o', output])
+
+            with open(output, encoding='utf-8') as f:
+                panels = json.load(f)["panels"]
+        self.assertEqual(code, 0)
+        self.assertEqual([panel["title"] for panel in panels], ["CPU"])
+
+
+if __name__ == "__main__":
+    unittest.main()
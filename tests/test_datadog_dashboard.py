@@ -0,0 +1,326 @@
+"""Tests for Datadog dashboard parsing and analysis."""
+
+import io
+import json
+import os
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+
+from graang.datadog_dashboard import DatadogDashboard
+from graang.errors import DashboardParsingError
+
+
+def load_dashboard(dashboard_data, **kwargs):
+    """Write dashboard data to a temporary file and parse it."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+        json.dump(dashboard_data, f)
+        temp_path = f.name
+
+    try:
+        return DatadogDashboard(temp_path, **kwargs)
+    finally:
+        os.unlink(temp_path)
+
+
+class TestMetricSources(unittest.TestCase):
+    """Test metric source extraction from queries."""
+
+    def test_metric_sources_from_all_request_formats(self):
+        """Test sources are counted for list, dict and queries-array requests."""
+        dashboard = load_dashboard({
+            "title": "Sources",
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "timeseries",
+                        "requests": [
+                            {"q": "avg:system.cpu.user{*}"},
+                            {"queries": [{"query": "sum:aws.ec2.cpu{env:prod}", "name": "q1"}]}
+                        ]
+                    }
+                },
+                {
+                    "definition": {
+                        "type": "query_value",
+                        "requests": {"fill": {"q": "max:system.load.1{host:web.1}"}}
+                    }
+                }
+            ]
+        })
+
+        self.assertEqual(dashboard.total_queries, 3)
+        self.assertEqual(dashboard.metric_sources["system"], 2)
+        self.assertEqual(dashboard.metric_sources["aws"], 1)
+
+    def test_queries_without_metric_source(self):
+        """Test queries with no dotted metric name are not counted."""
+        dashboard = load_dashboard({
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "timeseries",
+                        "requests": [
+                            {"q": "no_colon_here"},
+                            {"q": "avg:nodots{host:web.1}"},
+                            {"q": "avg:nodots:system.cpu"}
+                        ]
+                    }
+                }
+            ]
+        })
+
+        self.assertEqual(dashboard.total_queries, 3)
+        self.assertEqual(len(dashboard.metric_sources), 0)
+
+    def test_null_queries_are_skipped(self):
+        """Test requests with null 'q' or 'queries' values are not counted."""
+        dashboard = load_dashboard({
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "timeseries",
+                        "requests": [{"q": None}, {"queries": None}, {"q": "avg:system.cpu{*}", "queries": None}]
+                    }
+                }
+            ]
+        })
+
+        self.assertEqual(dashboard.total_queries, 1)
+        self.assertEqual(dict(dashboard.metric_sources), {"system": 1})
+        self.assertNotIn("Query 0: None", dashboard.render_report())
+
+    def test_non_dict_requests_are_skipped(self):
+        """Test request list entries that are not objects are neither counted nor reported."""
+        dashboard = load_dashboard({
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "timeseries",
+                        "requests": ["oops", None, {"q": "avg:system.cpu{*}"}]
+                    }
+                },
+                {
+                    "definition": {
+                        "type": "query_value",
+                        "requests": {"size": [None, {"q": "sum:aws.ec2.cpu{*}"}]}
+                    }
+                }
+            ]
+        })
+
+        self.assertEqual(dashboard.total_queries, 2)
+        self.assertEqual(dict(dashboard.metric_sources), {"system": 1, "aws": 1})
+        report = dashboard.render_report()
+        self.assertIn("  Queries (3):\n    Query 2: avg:system.cpu{*}\n", report)
+        self.assertIn("    size (2 queries)\n      Query 1: sum:aws.ec2.cpu{*}\n", report)
+
+    def test_process_request_updates_counters(self):
+        """Test process_request on a parsed dashboard counts the query immediately."""
+        dashboard = load_dashboard({"widgets": []})
+
+        dashboard.process_request({"q": "avg:system.cpu{*}", "type": "line"})
+        dashboard.process_request({"queries": [{"query": "sum:aws.ec2.cpu{*}", "name": "q1"}]})
+
+        self.assertEqual(dashboard.total_queries, 2)
+        self.assertEqual(dict(dashboard.query_types), {"line": 1, "q1": 1})
+        self.assertEqual(dict(dashboard.metric_sources), {"system": 1, "aws": 1})
+
+    def test_process_widgets_updates_counters(self):
+        """Test process_widgets on a parsed dashboard counts query types and sources."""
+        dashboard = load_dashboard({"widgets": []})
+
+        dashboard.process_widgets([
+            {"definition": {"type": "timeseries", "requests": [{"q": "avg:system.cpu{*}", "type": "line"}]}}
+        ])
+
+        self.assertEqual(dashboard.total_queries, 1)
+        self.assertEqual(dict(dashboard.query_types), {"line": 1})
+        self.assertEqual(dict(dashboard.metric_sources), {"system": 1})
+
+    def test_non_string_queries_are_counted_without_source(self):
+        """Test a non-string 'q' is counted but not analyzed for a metric source."""
+        dashboard = load_dashboard({
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "timeseries",
+                        "requests": [{"q": ["avg:a.b"]}, {"queries": [{"query": {"metric": "x.y"}}]}]
+                    }
+                }
+            ]
+        })
+
+        self.assertEqual(dashboard.total_queries, 2)
+        self.assertEqual(dashboard.query_types["unknown"], 2)
+        self.assertEqual(len(dashboard.metric_sources), 0)
+
+    def test_analyze_query_handles_malformed_queries(self):
+        """Test malformed queries are skipped without raising."""
+        dashboard = load_dashboard({"widgets": []})
+
+        for query in ["", ":", "::", "avg:", "avg:{.}", "avg:system", "a:b:c.d"]:
+            dashboard.analyze_query(query)
+        self.assertEqual(len(dashboard.metric_sources), 0)
+
+        dashboard.analyze_query("avg:.cpu{*}")
+        dashboard.analyze_query("avg:system.cpu{*}")
+        self.assertEqual(dict(dashboard.metric_sources), {"": 1, "system": 1})
+
+
+class TestWidgetTraversal(unittest.TestCase):
+    """Test walking nested group widgets."""
+
+    def test_nested_widgets_keep_document_order(self):
+        """Test nested widgets are collected in document order."""
+        dashboard = load_dashboard({
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "group",
+                        "widgets": [
+                            {"definition": {"type": "note", "title": "first"}},
+                            {
+                                "definition": {
+                                    "type": "group",
+                                    "widgets": [{"definition": {"type": "note", "title": "second"}}]
+                                }
+                            },
+                            {"definition": {"type": "note", "title": "third"}}
+                        ]
+                    }
+                },
+                {"definition": {"type": "timeseries", "title": "top-level"}}
+            ]
+        })
+
+        titles = [w["definition"]["title"] for w in dashboard.nested_widgets]
+        self.assertEqual(titles, ["first", "second", "third"])
+        self.assertEqual(len(dashboard.group_widgets), 2)
+        self.assertEqual(dashboard.widget_types["note"], 3)
+
+    def test_collect_widgets_without_analysis(self):
+        """Test analyze=False collects the same widget lists but skips query analysis."""
+        dashboard_data = {
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "group",
+                        "widgets": [
+                            {"definition": {"type": "timeseries", "requests": [{"q": "avg:system.cpu{*}"}]}},
+                            {"definition": {"type": "group", "widgets": [{"definition": {"type": "note"}}]}}
+                        ]
+                    }
+                },
+                {"id": "no-definition"},
+                {"definition": {"type": "query_value", "requests": [{"q": "sum:aws.ec2.cpu{*}"}]}}
+            ]
+        }
+        analyzed = load_dashboard(dashboard_data)
+        dashboard = load_dashboard(dashboard_data, analyze=False)
+
+        self.assertEqual(dashboard.widgets, analyzed.widgets)
+        self.assertEqual(dashboard.group_widgets, analyzed.group_widgets)
+        self.assertEqual(dashboard.nested_widgets, analyzed.nested_widgets)
+        self.assertEqual(dashboard.total_queries, 0)
+        self.assertEqual(len(dashboard.widget_types), 0)
+
+        with self.assertLogs('graang', level='ERROR'):
+            self.assertEqual(dashboard.render_report(), "")
+
+    def test_malformed_widget_entries_are_skipped(self):
+        """Test widget entries that are not objects are skipped when parsing and reporting."""
+        dashboard_data = {
+            "widgets": [
+                "oops",
+                None,
+                {"definition": {"type": "group", "widgets": [None, {"definition": {"type": "note"}}]}},
+                {"definition": {"type": "timeseries", "requests": [{"q": "avg:system.cpu{*}"}]}}
+            ]
+        }
+
+        collected = load_dashboard(dashboard_data, analyze=False)
+        dashboard = load_dashboard(dashboard_data)
+
+        for parsed in (collected, dashboard):
+            self.assertEqual(len(parsed.group_widgets), 1)
+            self.assertEqual(len(parsed.nested_widgets), 1)
+        self.assertEqual(dashboard.total_queries, 1)
+        self.assertIn("Widget 4: [No title] (timeseries)", dashboard.render_report())
+
+
+class TestReport(unittest.TestCase):
+    """Test the dashboard analysis report."""
+
+    def setUp(self):
+        self.dashboard = load_dashboard({
+            "title": "Report Dashboard",
+            "widgets": [
+                {
+                    "definition": {
+                        "type": "group",
+                        "title": "Group",
+                        "widgets": [
+                            {
+                                "definition": {
+                                    "type": "timeseries",
+                                    "title": "CPU",
+                                    "requests": [{"q": "avg:system.cpu.user{*}", "type": "line"}]
+                                }
+                            }
+                        ]
+                    }
+                }
+            ]
+        })
+
+    def test_render_report_sections(self):
+        """Test the rendered report contains every section."""
+        report = self.dashboard.render_report()
+
+        self.assertIn("Dashboard Title: Report Dashboard", report)
+        self.assertIn("SUMMARY STATISTICS", report)
+        self.assertIn("  - system: 1", report)
+        self.assertIn("Widget 1: Group (group)\n  Group contains 1 widgets:\n", report)
+        self.assertIn("    Widget 1: CPU (timeseries)\n", report)
+        self.assertIn("        Query 0: avg:system.cpu.user{*}\n          Type: line\n", report)
+
+    def test_render_report_description(self):
+        """Test short descriptions are kept as-is and long ones are wrapped."""
+        self.dashboard.description = "Short description"
+        self.assertIn("\nDescription:\nShort description\n", self.dashboard.render_report())
+
+        self.dashboard.description = "word " * 30 + "\nlast line"
+        report = self.dashboard.render_report()
+        description = report.split("\nDescription:\n", 1)[1].split("\n\n", 1)[0]
+        self.assertEqual(description.split("\n"), textwrap.wrap(("word " * 30) + " last line", width=80))
+
+    def test_raw_data_released_after_parse(self):
+        """Test the parsed JSON is dropped and the report is built without it."""
+        self.assertIsNone(self.dashboard.data)
+        self.assertIn("Widget 1: CPU (timeseries)", self.dashboard.render_report())
+        self.assertTrue(self.dashboard.validate_dashboard_structure())
+        with self.assertRaisesRegex(DashboardParsingError, "already been parsed"):
+            self.dashboard.parse_dashboard()
+
+    def test_print_widget_hierarchy_from_widget_list(self):
+        """Test passing the widget list prints the same structure as the default."""
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            self.dashboard.print_widget_hierarchy(self.dashboard.widgets)
+
+        default = io.StringIO()
+        self.dashboard.print_widget_hierarchy(buf=default)
+        self.assertEqual(mock_stdout.getvalue(), default.getvalue())
+        self.assertIn("    Widget 1: CPU (timeseries)\n", default.getvalue())
+
+    def test_print_report_writes_rendered_report(self):
+        """Test print_report writes the rendered report to stdout."""
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            self.dashboard.print_report()
+
+        self.assertEqual(mock_stdout.getvalue(), self.dashboard.render_report())
+
+
+if __name__ == "__main__":
+    unittest.main()
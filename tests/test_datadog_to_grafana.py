@@ -1,6 +1,7 @@
 import json
 import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 
@@ -50,17 +51,24 @@ class TestDatadogToGrafanaConverter(unittest.TestCase):
         self.assertEqual(len(result["panels"]), 0)
         self.assertEqual(len(result["templating"]["list"]), 0)
     
-    @patch('uuid.uuid4')
-    def test_uid_generation(self, mock_uuid):
+    @patch('secrets.token_hex')
+    def test_uid_generation(self, mock_token_hex):
         """Test that a UID is generated correctly"""
         # Configure mock to return a known value
-        mock_uuid.return_value = "12345678-90ab-cdef-1234-567890abcdef"
+        mock_token_hex.return_value = "12345678"
         
-        # Create a new converter which should use our mocked UUID
+        # Create a new converter which should use our mocked token
         converter = DatadogToGrafanaConverter(self.mock_dashboard)
         
-        # Check that the UID is correct
+        # Check that the UID is 8 random hex characters
+        mock_token_hex.assert_called_once_with(4)
         self.assertEqual(converter.grafana["uid"], "12345678")
+
+    def test_uid_format(self):
+        """Test that generated UIDs are 8 lowercase hex characters"""
+        uid = DatadogToGrafanaConverter(self.mock_dashboard).grafana["uid"]
+
+        self.assertRegex(uid, r'^[0-9a-f]{8}$')
     
     def test_convert_template_variables(self):
         """Test conversion of template variables"""
@@ -172,6 +180,23 @@ class TestDatadogToGrafanaConverter(unittest.TestCase):
         # Check that panel ID was incremented
         self.assertEqual(self.converter.panel_id, 2)
 
+    def test_malformed_widget_entries_are_skipped(self):
+        """Test widget entries that are not objects are skipped"""
+        dashboard = MockDatadogDashboard(widgets=["oops", None, {"definition": {"type": "note", "content": "hi"}}])
+
+        result = DatadogToGrafanaConverter(dashboard).convert()
+
+        self.assertEqual([panel["type"] for panel in result["panels"]], ["text"])
+
+    def test_patched_converter_method_is_used(self):
+        """Test patching a _convert_* method after construction takes effect"""
+        widget = {"definition": {"type": "timeseries", "title": "CPU Usage"}}
+
+        with patch.object(DatadogToGrafanaConverter, '_convert_timeseries') as mock_convert:
+            panel = self.converter._convert_widget_to_panel(widget)
+
+        mock_convert.assert_called_once_with(widget["definition"], panel)
+
 
 class TestGrafanaDashboardExporter(unittest.TestCase):
     def test_export_successful(self):
@@ -215,6 +240,29 @@ class TestGrafanaDashboardExporter(unittest.TestCase):
             # Check result
             self.assertFalse(result)
 
+    def test_export_many(self):
+        """Test exporting several dashboards in parallel keeps per-file results in order"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            valid_path = os.path.join(temp_dir, "valid.json")
+            with open(valid_path, 'w') as f:
+                json.dump({"title": "Valid", "widgets": [{"definition": {"type": "note", "content": "hi"}}]}, f)
+
+            paths = [
+                (valid_path, os.path.join(temp_dir, "valid_grafana.json")),
+                (os.path.join(temp_dir, "missing.json"), os.path.join(temp_dir, "missing_grafana.json")),
+            ]
+            with patch('sys.stderr'):
+                results = GrafanaDashboardExporter.export_many(paths, max_workers=2)
+
+            self.assertEqual(results, [True, False])
+            with open(paths[0][1]) as f:
+                self.assertEqual(json.load(f)["title"], "Valid")
+            self.assertFalse(os.path.exists(paths[1][1]))
+
+    def test_export_many_empty(self):
+        """Test exporting no dashboards returns no results"""
+        self.assertEqual(GrafanaDashboardExporter.export_many([]), [])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
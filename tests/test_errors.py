@@ -94,6 +94,20 @@ class TestDashboardParsingErrors(unittest.TestCase):
         finally:
             os.unlink(temp_path)
 
+    def test_parsing_deeply_nested_file(self):
+        """Test parsing a dashboard nested beyond the allowed depth."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+            f.write('{"widgets": ' + '[' * 500 + ']' * 500 + '}')
+            temp_path = f.name
+
+        try:
+            with self.assertRaises(DashboardParsingError) as cm:
+                DatadogDashboard(temp_path)
+
+            self.assertIn("too deeply nested", str(cm.exception))
+        finally:
+            os.unlink(temp_path)
+
 
 class TestConversionErrors(unittest.TestCase):
     """Test conversion error messages."""
@@ -1,10 +1,21 @@
 """Comprehensive tests for utility functions."""
 
+import io
+import json
+import math
 import unittest
+from unittest.mock import patch
+
+import graang.utils
 from graang.utils import (
     convert_datadog_query_to_prometheus,
+    build_grafana_dashboard,
     build_grafana_target,
     convert_requests_to_targets,
+    convert_template_variables,
+    dump_json,
+    dumps_json,
+    loads_json,
     GridLayoutCalculator
 )
 
@@ -342,5 +353,111 @@ class TestGridLayoutCalculator(unittest.TestCase):
             self.assertGreater(pos["h"], 0)
 
 
+class TestBuildGrafanaDashboard(unittest.TestCase):
+    """Test the empty Grafana dashboard builder."""
+
+    def test_dashboard_fields(self):
+        """Test title, uid, tags and time range are filled in."""
+        dashboard = build_grafana_dashboard("Title", "abc123", ["tag"], "now-1h", "now-5m")
+
+        self.assertEqual(dashboard["title"], "Title")
+        self.assertEqual(dashboard["uid"], "abc123")
+        self.assertEqual(dashboard["tags"], ["tag"])
+        self.assertEqual(dashboard["time"], {"from": "now-1h", "to": "now-5m"})
+        self.assertEqual(dashboard["panels"], [])
+        self.assertEqual(len(dashboard["annotations"]["list"]), 1)
+
+    def test_dashboards_share_no_state(self):
+        """Test each call returns independent nested structures."""
+        first = build_grafana_dashboard("One")
+        second = build_grafana_dashboard("Two")
+
+        first["panels"].append({"id": 1})
+        first["tags"].append("tag")
+        first["annotations"]["list"][0]["hide"] = False
+
+        self.assertEqual(second["panels"], [])
+        self.assertEqual(second["tags"], [])
+        self.assertTrue(second["annotations"]["list"][0]["hide"])
+
+
+class TestConvertTemplateVariables(unittest.TestCase):
+    """Test template variable conversion."""
+
+    def test_full_variable(self):
+        """Test prefix, default and values are mapped."""
+        [var] = convert_template_variables([
+            {"name": "env", "prefix": "environment", "default": "prod", "values": ["prod", "dev"]}
+        ])
+
+        self.assertEqual(var["name"], "env")
+        self.assertEqual(var["query"], "environment")
+        self.assertEqual(var["current"], {"value": "prod", "text": "prod"})
+        self.assertEqual(var["options"], [{"text": "prod", "value": "prod"}, {"text": "dev", "value": "dev"}])
+
+    def test_minimal_variable(self):
+        """Test missing fields fall back to empty values."""
+        [var] = convert_template_variables([{}])
+
+        self.assertEqual(var["name"], "")
+        self.assertEqual(var["query"], "")
+        self.assertEqual(var["current"], {})
+        self.assertEqual(var["options"], [])
+
+
+class TestLoadsJson(unittest.TestCase):
+    """Test JSON parsing helper."""
+
+    def test_parses_utf8_bytes(self):
+        """Test parsing a UTF-8 encoded document."""
+        data = loads_json('{"title": "Caf\u00e9", "widgets": []}'.encode('utf-8'))
+        self.assertEqual(data, {"title": "Caf\u00e9", "widgets": []})
+
+    def test_invalid_json_raises_decode_error(self):
+        """Test that invalid JSON raises json.JSONDecodeError."""
+        with self.assertRaises(json.JSONDecodeError):
+            loads_json(b'{"invalid": json content}')
+
+    def test_backends_agree_on_encoding_and_nan(self):
+        """Test BOM, non-UTF-8 and NaN documents give the same result with and without orjson."""
+        for backend in (graang.utils.orjson, None):
+            with self.subTest(orjson=backend is not None), patch('graang.utils.orjson', backend):
+                with self.assertRaisesRegex(json.JSONDecodeError, "BOM"):
+                    loads_json(b'\xef\xbb\xbf{"widgets": []}')
+                with self.assertRaises(UnicodeDecodeError):
+                    loads_json('{"widgets": []}'.encode('utf-16'))
+
+                data = loads_json(b'{"a": NaN, "b": -Infinity}')
+                self.assertTrue(math.isnan(data["a"]))
+                self.assertEqual(data["b"], float('-inf'))
+
+
+class TestDumpsJson(unittest.TestCase):
+    """Test JSON serialization helper."""
+
+    def test_round_trip(self):
+        """Test serialized output parses back to the same data."""
+        data = {"title": "Caf\u00e9", "panels": [{"id": 1, "gridPos": {"x": 0}}], "tags": []}
+        output = dumps_json(data)
+
+        self.assertIsInstance(output, bytes)
+        self.assertEqual(json.loads(output), data)
+        self.assertIn("Caf\u00e9".encode('utf-8'), output)
+
+    def test_two_space_indent(self):
+        """Test output is indented by two spaces."""
+        self.assertEqual(dumps_json({"a": [1]}), b'{\n  "a": [\n    1\n  ]\n}')
+
+    def test_dump_json_matches_dumps_json(self):
+        """Test writing to a file gives the same bytes with and without orjson."""
+        data = {"title": "Caf\u00e9", "panels": [{"id": i, "targets": []} for i in range(3)]}
+
+        for backend in (graang.utils.orjson, None):
+            with patch('graang.utils.orjson', backend):
+                buf = io.BytesIO()
+                dump_json(data, buf)
+                self.assertEqual(buf.getvalue(), dumps_json(data))
+
+
 if __name__ == "__main__":
     unittest.main()